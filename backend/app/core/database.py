@@ -2,13 +2,14 @@
 # SQLAlchemy avec support async et gestion des sessions
 
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     create_async_engine,
     async_sessionmaker
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.pool import StaticPool
-from sqlalchemy import event
+from sqlalchemy import event, text
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 import structlog
@@ -21,32 +22,55 @@ logger = structlog.get_logger()
 # 🔧 CONFIGURATION MOTEUR
 # =============================================================================
 
-# Configuration du moteur selon l'environnement
-if settings.is_testing:
-    # SQLite pour tests (synchrone converti en async)
-    SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
-    engine = create_async_engine(
-        SQLALCHEMY_DATABASE_URL,
-        echo=settings.DEBUG,
-        poolclass=StaticPool,
-        connect_args={
-            "check_same_thread": False,
-        },
-    )
-else:
-    # PostgreSQL pour développement/production
-    SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL.replace(
-        "postgresql://", "postgresql+asyncpg://"
-    )
-    engine = create_async_engine(
-        SQLALCHEMY_DATABASE_URL,
-        echo=settings.DEBUG,
-        pool_size=settings.DB_POOL_SIZE,
-        max_overflow=settings.DB_MAX_OVERFLOW,
-        pool_timeout=settings.DB_POOL_TIMEOUT,
-        pool_pre_ping=True,  # Vérification santé connexions
-        pool_recycle=3600,   # Recycler connexions après 1h
-    )
+def _build_engine(settings) -> AsyncEngine:
+    """
+    Construire le moteur async selon l'environnement
+    Factory unique (test/prod) exposée pour que les tests puissent
+    remplacer le moteur sans recharger le module
+    """
+    kwargs = {"echo": settings.DEBUG}
+
+    if settings.is_testing:
+        # SQLite pour tests (synchrone converti en async)
+        url = "sqlite+aiosqlite:///./test.db"
+        kwargs.update(
+            poolclass=StaticPool,
+            connect_args={
+                "check_same_thread": False,
+            },
+        )
+    else:
+        # PostgreSQL pour développement/production
+        url = settings.DATABASE_URL.replace(
+            "postgresql://", "postgresql+asyncpg://"
+        )
+        kwargs.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_pre_ping=True,  # Vérification santé connexions
+            pool_recycle=3600,   # Recycler connexions après 1h
+        )
+
+    return create_async_engine(url, **kwargs)
+
+# Moteur construit une seule fois à l'import
+engine = _build_engine(settings)
+
+# URL résolue mise en cache (évite str(engine.url) + split par requête)
+SQLALCHEMY_DATABASE_URL = str(engine.url)
+_DATABASE_URL_DISPLAY = (
+    SQLALCHEMY_DATABASE_URL.split("@")[-1]
+    if "@" in SQLALCHEMY_DATABASE_URL
+    else SQLALCHEMY_DATABASE_URL
+)
+_IS_POSTGRES = "postgresql" in SQLALCHEMY_DATABASE_URL
+
+# Clauses SQL préparées une seule fois (évite le re-parse TextClause
+# à chaque sonde de santé)
+_HEALTH_SQL = text("SELECT 1")
+_PG_VERSION_SQL = text("SELECT version()")
+_SQLITE_VERSION_SQL = text("SELECT sqlite_version()")
 
 # =============================================================================
 # 🏗️ SESSION FACTORY
@@ -107,8 +131,8 @@ async def init_db() -> None:
     try:
         async with engine.begin() as conn:
             # Importer tous les modèles pour s'assurer qu'ils sont enregistrés
-            from app.models import *  # noqa
-            
+            import app.models  # noqa: F401
+
             # Créer toutes les tables
             await conn.run_sync(Base.metadata.create_all)
             
@@ -160,21 +184,23 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
         cursor.execute("PRAGMA synchronous=NORMAL")
         cursor.close()
 
-@event.listens_for(engine.sync_engine, "checkout")
 def receive_checkout(dbapi_connection, connection_record, connection_proxy):
     """
     Log des checkout de connexions
     """
-    if settings.DEBUG:
-        logger.debug("Connexion DB checkout")
+    logger.debug("Connexion DB checkout")
 
-@event.listens_for(engine.sync_engine, "checkin")
 def receive_checkin(dbapi_connection, connection_record):
     """
     Log des checkin de connexions
     """
-    if settings.DEBUG:
-        logger.debug("Connexion DB checkin")
+    logger.debug("Connexion DB checkin")
+
+# N'enregistrer les listeners qu'en DEBUG: hors DEBUG, SQLAlchemy
+# n'invoque ainsi aucun callback Python par checkout/checkin du pool
+if settings.DEBUG:
+    event.listen(engine.sync_engine, "checkout", receive_checkout)
+    event.listen(engine.sync_engine, "checkin", receive_checkin)
 
 # =============================================================================
 # 🧪 UTILITAIRES POUR TESTS
@@ -210,7 +236,7 @@ async def health_check_db() -> bool:
     """
     try:
         async with get_db_session() as session:
-            result = await session.execute("SELECT 1")
+            result = await session.execute(_HEALTH_SQL)
             return result.scalar() == 1
     except Exception as e:
         logger.error(f"Health check DB failed: {e}")
@@ -222,15 +248,15 @@ async def get_db_info() -> dict:
     """
     try:
         async with get_db_session() as session:
-            if "postgresql" in str(engine.url):
-                result = await session.execute("SELECT version()")
+            if _IS_POSTGRES:
+                result = await session.execute(_PG_VERSION_SQL)
                 version = result.scalar()
             else:
-                result = await session.execute("SELECT sqlite_version()")
+                result = await session.execute(_SQLITE_VERSION_SQL)
                 version = f"SQLite {result.scalar()}"
                 
             return {
-                "url": str(engine.url).split("@")[-1] if "@" in str(engine.url) else str(engine.url),
+                "url": _DATABASE_URL_DISPLAY,
                 "version": version,
                 "pool_size": engine.pool.size() if hasattr(engine.pool, 'size') else None,
                 "checked_out": engine.pool.checkedout() if hasattr(engine.pool, 'checkedout') else None
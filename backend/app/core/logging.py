@@ -1,16 +1,45 @@
 # 🌱 Smart Irrigation System - Configuration Logging
 # Logging structuré avec Structlog et Rich pour développement
 
+import asyncio
+import atexit
+import queue
+import re
 import sys
 import logging
+import orjson
 import structlog
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from rich.console import Console
-from rich.logging import RichHandler
 from typing import Any, Dict
 
+# rich n'est importé qu'en mode DEBUG (voir setup_logging):
+# en production c'est du poids mort au démarrage (imports + RSS)
+
 from app.core.config import settings
 
+# Listener de la file de logs (démarré par setup_logging)
+_queue_listener: QueueListener | None = None
+
+class _DropOnFullQueueHandler(QueueHandler):
+    """
+    QueueHandler sur file bornée: jette l'enregistrement quand la file
+    est pleine plutôt que de bloquer (ou faire échouer) le chemin chaud
+    """
+    def enqueue(self, record) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+def _orjson_serializer(obj, **kwargs) -> str:
+    """
+    Sérialiseur JSON basé sur orjson (Rust) pour structlog
+    Les handlers stdlib attendent du str: on décode les bytes UTF-8
+    """
+    return orjson.dumps(obj, default=str).decode("utf-8")
+
 def setup_logging() -> None:
     """
     Configuration du système de logging avec Structlog
@@ -22,30 +51,27 @@ def setup_logging() -> None:
     
     # Niveau de log
     log_level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
-    
-    # Console pour développement
-    console = Console()
-    
+
     # =============================================================================
     # 📊 PROCESSEURS STRUCTLOG
     # =============================================================================
     
     shared_processors = [
+        # Contexte lié une seule fois via bind_contextvars (chemin rapide C)
+        structlog.contextvars.merge_contextvars,
         # Ajouter timestamp
         structlog.stdlib.add_log_level,
         structlog.stdlib.add_logger_name,
         structlog.processors.TimeStamper(fmt="%Y-%m-%d %H:%M:%S.%f", utc=True),
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
-        # Ajouter informations contextuelles
-        add_context_processor,
     ]
     
     if settings.LOG_FORMAT == "json":
         # Format JSON pour production
         processors = shared_processors + [
             structlog.processors.dict_tracebacks,
-            structlog.processors.JSONRenderer()
+            structlog.processors.JSONRenderer(serializer=_orjson_serializer)
         ]
     else:
         # Format lisible pour développement
@@ -54,12 +80,23 @@ def setup_logging() -> None:
         ]
     
     # Configuration Structlog
+    # FilteringBoundLogger: les niveaux filtrés sortent avant tout
+    # traitement; l'émission finale passe par le logger stdlib pour
+    # que le QueueHandler s'applique
     structlog.configure(
         processors=processors,
-        wrapper_class=structlog.stdlib.BoundLogger,
+        wrapper_class=structlog.make_filtering_bound_logger(log_level),
         logger_factory=structlog.stdlib.LoggerFactory(),
         cache_logger_on_first_use=True,
     )
+
+    # Contexte statique lié une seule fois (au lieu d'un processeur
+    # Python exécuté à chaque événement de log)
+    structlog.contextvars.bind_contextvars(
+        service="irrigation-backend",
+        version=settings.VERSION,
+        environment=settings.ENVIRONMENT
+    )
     
     # =============================================================================
     # 📋 HANDLERS
@@ -69,9 +106,12 @@ def setup_logging() -> None:
     
     # Handler console
     if settings.DEBUG:
-        # Rich handler pour développement
+        # Rich handler pour développement (import paresseux)
+        from rich.console import Console
+        from rich.logging import RichHandler
+
         console_handler = RichHandler(
-            console=console,
+            console=Console(),
             show_time=True,
             show_path=True,
             rich_tracebacks=True,
@@ -99,24 +139,49 @@ def setup_logging() -> None:
         )
         file_handler.setLevel(log_level)
         
-        # Format pour fichier
+        # Format pour fichier (style "{" = chemin rapide str.format,
+        # évite l'opérateur % par enregistrement)
         if settings.LOG_FORMAT == "json":
-            file_formatter = logging.Formatter('%(message)s')
+            file_formatter = logging.Formatter('{message}', style='{')
         else:
             file_formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+                '{asctime} - {name} - {levelname} - {message}',
+                style='{'
             )
         file_handler.setFormatter(file_formatter)
         handlers.append(file_handler)
     
+    # =============================================================================
+    # 🚚 PIPELINE NON-BLOQUANT (QueueHandler -> QueueListener)
+    # =============================================================================
+
+    # Le chemin chaud ne fait qu'un enqueue O(1) sans verrou; l'I/O
+    # console/fichier (write + rotation) est drainée par un thread dédié
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+
+    # File bornée: borne la mémoire sous burst, drop plutôt que blocage
+    log_queue = queue.Queue(maxsize=10_000)
+    queue_handler = _DropOnFullQueueHandler(log_queue)
+    queue_handler.setLevel(log_level)
+
+    _queue_listener = QueueListener(
+        log_queue,
+        *handlers,
+        respect_handler_level=True
+    )
+    _queue_listener.start()
+    atexit.register(stop_logging)  # idempotent (no-op si déjà arrêté)
+
     # =============================================================================
     # 🔧 CONFIGURATION LOGGING STANDARD
     # =============================================================================
-    
-    # Configuration du logger racine
+
+    # Configuration du logger racine (seul le QueueHandler est attaché)
     logging.basicConfig(
         level=log_level,
-        handlers=handlers,
+        handlers=[queue_handler],
         force=True
     )
     
@@ -133,17 +198,6 @@ def setup_logging() -> None:
         environment=settings.ENVIRONMENT
     )
 
-def add_context_processor(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Processeur pour ajouter du contexte aux logs
-    """
-    # Ajouter des informations contextuelles
-    event_dict["service"] = "irrigation-backend"
-    event_dict["version"] = settings.VERSION
-    event_dict["environment"] = settings.ENVIRONMENT
-    
-    return event_dict
-
 def configure_specific_loggers(log_level: int) -> None:
     """
     Configuration spécifique pour certains loggers
@@ -173,13 +227,25 @@ def configure_specific_loggers(log_level: int) -> None:
     # Redis
     logging.getLogger("aioredis").setLevel(logging.WARNING)
 
+def stop_logging() -> None:
+    """
+    Arrêter le listener de la file de logs (drain puis stop, idempotent)
+    À appeler en fin de cycle de vie, après l'arrêt des autres services
+    """
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
 # =============================================================================
 # 🔧 UTILITAIRES LOGGING
 # =============================================================================
 
+@lru_cache(maxsize=256)
 def get_logger(name: str = None) -> structlog.BoundLogger:
     """
-    Obtenir un logger Structlog
+    Obtenir un logger Structlog (mis en cache par nom)
+    Les BoundLogger sont réutilisables avec cache_logger_on_first_use=True
     """
     return structlog.get_logger(name)
 
@@ -219,13 +285,58 @@ T = TypeVar('T')
 def log_calls(logger_name: str = None) -> Callable[[Callable[..., T]], Callable[..., T]]:
     """
     Décorateur pour logger automatiquement les appels de fonction
+    Si DEBUG est filtré, seul le log d'erreur (avec durée) est conservé;
+    no-op complet uniquement si ERROR lui-même est filtré
     """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        # Court-circuit à la décoration selon le niveau configuré
+        level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
+        if level > logging.ERROR:
+            return func
+
+        # Logger résolu une seule fois à la décoration (clé de cache stable)
+        logger = get_logger(logger_name or func.__module__)
+
+        if level > logging.DEBUG:
+            # DEBUG filtré: wrappers allégés sans logs start/success,
+            # mais le log d'erreur (chemin rare) est conservé
+
+            @wraps(func)
+            async def async_error_wrapper(*args, **kwargs) -> T:
+                start_time = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    logger.error(
+                        "Function error",
+                        function=func.__name__,
+                        error=str(e),
+                        duration_ms=round((time.perf_counter() - start_time) * 1000, 2)
+                    )
+                    raise
+
+            @wraps(func)
+            def sync_error_wrapper(*args, **kwargs) -> T:
+                start_time = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    logger.error(
+                        "Function error",
+                        function=func.__name__,
+                        error=str(e),
+                        duration_ms=round((time.perf_counter() - start_time) * 1000, 2)
+                    )
+                    raise
+
+            if asyncio.iscoroutinefunction(func):
+                return async_error_wrapper
+            return sync_error_wrapper
+
         @wraps(func)
         async def async_wrapper(*args, **kwargs) -> T:
-            logger = get_logger(logger_name or func.__module__)
-            start_time = time.time()
-            
+            start_time = time.perf_counter()
+
             logger.debug(
                 "Function start",
                 function=func.__name__,
@@ -235,7 +346,7 @@ def log_calls(logger_name: str = None) -> Callable[[Callable[..., T]], Callable[
             
             try:
                 result = await func(*args, **kwargs)
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
                 
                 logger.debug(
                     "Function success",
@@ -246,7 +357,7 @@ def log_calls(logger_name: str = None) -> Callable[[Callable[..., T]], Callable[
                 return result
                 
             except Exception as e:
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
                 
                 logger.error(
                     "Function error",
@@ -259,8 +370,7 @@ def log_calls(logger_name: str = None) -> Callable[[Callable[..., T]], Callable[
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs) -> T:
-            logger = get_logger(logger_name or func.__module__)
-            start_time = time.time()
+            start_time = time.perf_counter()
             
             logger.debug(
                 "Function start",
@@ -271,7 +381,7 @@ def log_calls(logger_name: str = None) -> Callable[[Callable[..., T]], Callable[
             
             try:
                 result = func(*args, **kwargs)
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
                 
                 logger.debug(
                     "Function success",
@@ -282,7 +392,7 @@ def log_calls(logger_name: str = None) -> Callable[[Callable[..., T]], Callable[
                 return result
                 
             except Exception as e:
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
                 
                 logger.error(
                     "Function error",
@@ -294,7 +404,6 @@ def log_calls(logger_name: str = None) -> Callable[[Callable[..., T]], Callable[
                 raise
         
         # Retourner le bon wrapper selon si la fonction est async
-        import asyncio
         if asyncio.iscoroutinefunction(func):
             return async_wrapper
         else:
@@ -306,22 +415,33 @@ def log_calls(logger_name: str = None) -> Callable[[Callable[..., T]], Callable[
 # 🔒 MASQUAGE DONNÉES SENSIBLES
 # =============================================================================
 
+# Matcher compilé une seule fois (une passe C sur la clé au lieu de
+# k tests `in` Python + allocation lower() par clé)
+_SENSITIVE_RE = re.compile(
+    r"password|token|secret|key|auth|credential|pass|pwd|api_key",
+    re.IGNORECASE
+)
+
+def _mask_value(key: str, value):
+    """Masquer une valeur selon sa clé (récursif sur les dicts)"""
+    if _SENSITIVE_RE.search(key):
+        return "***masked***"
+    if isinstance(value, dict):
+        return mask_sensitive_data(value)
+    return value
+
 def mask_sensitive_data(data: dict) -> dict:
     """
     Masquer les données sensibles dans les logs
+    Retourne le dict d'origine si rien n'est à masquer (à traiter
+    comme immuable côté appelant), sinon une copie en une passe
     """
-    sensitive_keys = {
-        'password', 'token', 'secret', 'key', 'auth',
-        'credential', 'pass', 'pwd', 'api_key'
-    }
-    
-    masked_data = {}
+    # Chemin rapide: aucune clé sensible ni dict imbriqué -> pas de copie
     for key, value in data.items():
-        if any(sensitive in key.lower() for sensitive in sensitive_keys):
-            masked_data[key] = "***masked***"
-        elif isinstance(value, dict):
-            masked_data[key] = mask_sensitive_data(value)
-        else:
-            masked_data[key] = value
-    
-    return masked_data
\ No newline at end of file
+        if isinstance(value, dict) or _SENSITIVE_RE.search(key):
+            break
+    else:
+        return data
+
+    # Copie en une passe (dict comprehension: capacité préallouée)
+    return {key: _mask_value(key, value) for key, value in data.items()}
\ No newline at end of file
@@ -1,32 +1,52 @@
 # 🌱 Smart Irrigation System - Application FastAPI principale
 # Point d'entrée avec middleware, routes, et WebSocket
 
-from fastapi import FastAPI, Request, Depends
+from fastapi import FastAPI, Request, Response, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
+from starlette.websockets import WebSocketDisconnect
 from prometheus_fastapi_instrumentator import Instrumentator
 
+import asyncio
+import logging
+import mimetypes
+import orjson
+import os
+import stat as stat_module
 import structlog
 import time
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import AsyncGenerator
 
-from app.core.config import settings
+from app.core.config import settings, ensure_runtime_dirs
 from app.core.database import engine, Base
-from app.core.logging import setup_logging
+from app.core.logging import setup_logging, stop_logging
 from app.core.cache import redis_client
 from app.api import router as api_router
 from app.websocket.manager import WebSocketManager
 from app.iot.mqtt_client import MQTTClient
 from app.core.scheduler import start_scheduler
 
-# Configuration logging
+# Répertoires runtime puis configuration logging
+ensure_runtime_dirs()
 setup_logging()
 logger = structlog.get_logger()
 
+# Niveau INFO effectif résolu une seule fois après setup_logging:
+# quand INFO est filtré, le middleware ne paie ni kwargs ni conversions
+_INFO_ENABLED = logging.getLogger().isEnabledFor(logging.INFO)
+
+# Branches dérivées de la config, constantes après l'import:
+# évaluées une seule fois au lieu d'un accès attribut + test par usage
+_DEBUG = settings.DEBUG
+_DOCS_URL = "/docs" if _DEBUG else None
+_REDOC_URL = "/redoc" if _DEBUG else None
+_OPENAPI_URL = "/openapi.json" if _DEBUG else None
+
 # Instances globales
 websocket_manager = WebSocketManager()
 mqtt_client = MQTTClient()
@@ -37,29 +57,66 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     Gestionnaire de cycle de vie de l'application
     Gère l'initialisation et la fermeture des services
     """
-    logger.info("Démarrage de l'application Smart Irrigation")
-    
-    try:
+    # Événements de démarrage accumulés puis émis en un seul log:
+    # une émission structlog (render + write) au lieu de six en série
+    startup_events: list[str] = []
+
+    async def _init_db() -> str:
         # 🗄️ Initialisation base de données
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        logger.info("✅ Base de données initialisée")
-        
-        # 🔄 Connexion Redis
-        await redis_client.ping()
-        logger.info("✅ Redis connecté")
-        
-        # 📡 Initialisation MQTT
-        await mqtt_client.connect()
-        logger.info("✅ MQTT connecté")
-        
-        # 🕰️ Démarrage scheduler
-        await start_scheduler()
-        logger.info("✅ Scheduler démarré")
-        
-        logger.info("🚀 Application démarrée avec succès")
+        # Retourne son message de succès (utilisé à la place de l'entrée
+        # générique "database initialisé" dans le log de démarrage)
+        if _DEBUG:
+            # create_all seulement en développement
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            return "✅ Base de données initialisée"
+        else:
+            # En production le schéma est migré par Alembic au déploiement;
+            # ne pas payer la réflexion DDL de create_all à chaque boot,
+            # vérifier seulement la révision courante et échouer vite
+            from alembic.runtime.migration import MigrationContext
+
+            def _current_revision(sync_conn):
+                return MigrationContext.configure(sync_conn).get_current_revision()
+
+            async with engine.connect() as conn:
+                revision = await conn.run_sync(_current_revision)
+            if revision is None:
+                raise RuntimeError(
+                    "Schéma non migré: exécuter `alembic upgrade head` avant le démarrage"
+                )
+            return f"✅ Schéma base de données vérifié (révision {revision})"
+
+    try:
+        # Étapes d'initialisation indépendantes lancées en parallèle:
+        # le temps de boot devient max(étapes) au lieu de leur somme
+        init_names = ("database", "redis", "mqtt", "scheduler")
+        results = await asyncio.gather(
+            _init_db(),
+            redis_client.ping(),
+            mqtt_client.connect(),
+            start_scheduler(),
+            return_exceptions=True
+        )
+
+        failed = []
+        for name, result in zip(init_names, results):
+            if isinstance(result, BaseException):
+                # Les erreurs restent émises immédiatement et individuellement
+                logger.error(f"❌ Échec initialisation {name}", error=str(result))
+                failed.append(name)
+            else:
+                # L'étape peut fournir son propre message (cf. _init_db)
+                startup_events.append(
+                    result if isinstance(result, str) else f"✅ {name} initialisé"
+                )
+
+        if failed:
+            raise RuntimeError(f"Échec du démarrage des services: {', '.join(failed)}")
+
+        logger.info("🚀 startup_complete", steps=startup_events)
         yield
-        
+
     except Exception as e:
         logger.error(f"❌ Erreur lors du démarrage: {e}")
         raise
@@ -74,6 +131,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             logger.info("✅ Ressources libérées")
         except Exception as e:
             logger.error(f"⚠️ Erreur lors de l'arrêt: {e}")
+        finally:
+            # Drainer la file de logs en dernier
+            stop_logging()
 
 # =============================================================================
 # 🚀 CREATION APPLICATION FASTAPI
@@ -82,19 +142,99 @@ app = FastAPI(
     title="Smart Irrigation System API",
     description="🌱 API REST pour système d'irrigation intelligente avec authentification JWT et intégration IoT",
     version="2.0.0",
-    docs_url="/docs" if settings.DEBUG else None,
-    redoc_url="/redoc" if settings.DEBUG else None,
-    openapi_url="/openapi.json" if settings.DEBUG else None,
+    docs_url=_DOCS_URL,
+    redoc_url=_REDOC_URL,
+    openapi_url=_OPENAPI_URL,
+    default_response_class=ORJSONResponse,  # sérialisation orjson (C) partout
     lifespan=lifespan
 )
 
+# Corps de réponse immuables pré-encodés une seule fois au démarrage
+_ROOT_BYTES = orjson.dumps({
+    "message": "🌱 Smart Irrigation System API",
+    "version": "2.0.0",
+    "docs": _DOCS_URL,
+    "status": "active"
+})
+
+# OpenAPI: schéma sérialisé une seule fois et servi en bytes
+# (la route par défaut re-sérialise le schéma à chaque poll des docs UI)
+if _DEBUG:
+    from starlette.routing import Route
+
+    _openapi_bytes: bytes | None = None
+
+    async def _openapi_endpoint(request: Request) -> Response:
+        global _openapi_bytes
+        if _openapi_bytes is None:
+            _openapi_bytes = orjson.dumps(app.openapi())
+        return Response(content=_openapi_bytes, media_type="application/json")
+
+    app.router.routes = [
+        r for r in app.router.routes
+        if not (isinstance(r, Route) and r.path == "/openapi.json")
+    ]
+    app.add_route("/openapi.json", _openapi_endpoint, include_in_schema=False)
+
 # =============================================================================
 # 🔒 MIDDLEWARE DE SÉCURITÉ
 # =============================================================================
 
+class FastCORSMiddleware(CORSMiddleware):
+    """
+    CORSMiddleware avec origines en frozenset: test d'appartenance O(1)
+    par preflight au lieu d'un scan linéaire de la liste
+    """
+
+    def __init__(self, app, **kwargs):
+        super().__init__(app, **kwargs)
+        self._allow_origins_set = frozenset(self.allow_origins)
+
+    def is_allowed_origin(self, origin: str) -> bool:
+        if self.allow_all_origins:
+            return True
+        if self.allow_origin_regex is not None and self.allow_origin_regex.fullmatch(origin):
+            return True
+        return origin in self._allow_origins_set
+
+class FastTrustedHostMiddleware(TrustedHostMiddleware):
+    """
+    TrustedHostMiddleware avec hôtes exacts en frozenset
+    Chemin rapide O(1) pour les hôtes autorisés; les motifs wildcard et
+    le refus/redirection www restent délégués à Starlette
+    """
+
+    def __init__(self, app, allowed_hosts=None, **kwargs):
+        super().__init__(app, allowed_hosts=allowed_hosts, **kwargs)
+        self._exact_hosts = frozenset(
+            h for h in self.allowed_hosts if not h.startswith("*")
+        )
+        self._wildcard_hosts = [h for h in self.allowed_hosts if h.startswith("*")]
+
+    async def __call__(self, scope, receive, send):
+        if self.allow_any or scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        host = b""
+        for name, value in scope.get("headers", ()):
+            if name == b"host":
+                host = value
+                break
+        host = host.decode("latin-1").split(":")[0]
+
+        if host in self._exact_hosts or any(
+            host.endswith(pattern[1:]) for pattern in self._wildcard_hosts
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # Hôte refusé: laisser Starlette gérer 400 / redirection www
+        await super().__call__(scope, receive, send)
+
 # CORS
 app.add_middleware(
-    CORSMiddleware,
+    FastCORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
@@ -103,9 +243,9 @@ app.add_middleware(
 )
 
 # Trusted hosts
-if not settings.DEBUG:
+if not _DEBUG:
     app.add_middleware(
-        TrustedHostMiddleware,
+        FastTrustedHostMiddleware,
         allowed_hosts=settings.ALLOWED_HOSTS
     )
 
@@ -115,7 +255,7 @@ app.add_middleware(
     secret_key=settings.SECRET_KEY,
     max_age=settings.SESSION_MAX_AGE,
     same_site="lax",
-    https_only=not settings.DEBUG
+    https_only=not _DEBUG
 )
 
 # =============================================================================
@@ -136,67 +276,166 @@ if settings.PROMETHEUS_ENABLED:
     )
     instrumentator.instrument(app).expose(app)
 
-# Middleware de logging des requêtes
-@app.middleware("http")
-async def logging_middleware(request: Request, call_next):
+# Middleware de logging des requêtes (ASGI pur: pas de construction
+# Request/Response ni de frame @app.middleware par requête)
+class LoggingASGIMiddleware:
     """
-    Middleware pour logger les requêtes HTTP avec temps de réponse
+    Middleware ASGI pour logger les requêtes HTTP avec temps de réponse
+    Le header X-Process-Time est injecté directement dans le message
+    http.response.start
     """
-    start_time = time.time()
-    
-    # Exécuter la requête
-    response = await call_next(request)
-    
-    # Calculer temps de traitement
-    process_time = time.time() - start_time
-    
-    # Logger les informations
-    logger.info(
-        "HTTP Request",
-        method=request.method,
-        url=str(request.url),
-        status_code=response.status_code,
-        process_time=round(process_time, 4),
-        client_ip=request.client.host if request.client else None,
-        user_agent=request.headers.get("user-agent", "")
-    )
-    
-    # Ajouter header temps de réponse
-    response.headers["X-Process-Time"] = str(process_time)
-    
-    return response
+
+    __slots__ = ("app",)
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Horloge monotone entière: pas de boxing float par requête
+        # et mesure insensible aux sauts NTP de l'horloge murale
+        start_ns = time.monotonic_ns()
+        status_code = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed_ns = time.monotonic_ns() - start_ns
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-process-time", f"{elapsed_ns / 1e9:.4f}".encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            # Le 500 est émis par le middleware d'erreurs plus haut dans
+            # la pile: ce middleware ne voit pas le http.response.start
+            if status_code == 0:
+                status_code = 500
+            raise
+        finally:
+            # Logger les informations (court-circuité si INFO est filtré)
+            if _INFO_ENABLED:
+                client = scope.get("client")
+                user_agent = b""
+                for name, value in scope.get("headers", ()):
+                    if name == b"user-agent":
+                        user_agent = value
+                        break
+
+                query_string = scope.get("query_string", b"")
+                url = scope["path"]
+                if query_string:
+                    url += "?" + query_string.decode("latin-1")
+
+                logger.info(
+                    "HTTP Request",
+                    method=scope["method"],
+                    url=url,
+                    status_code=status_code,
+                    # ns entiers: pas de round() ni reformatage de float
+                    process_time_ns=time.monotonic_ns() - start_ns,
+                    client_ip=client[0] if client else None,
+                    user_agent=user_agent.decode("latin-1")
+                )
+
+app.add_middleware(LoggingASGIMiddleware)
 
 # =============================================================================
-# 📡 GESTIONNAIRES D'EXCEPTIONS
+# 📡 GESTIONNAIRES D'EXCEPTIONS (ASGI, corps pré-encodés)
 # =============================================================================
 
-@app.exception_handler(500)
-async def internal_server_error_handler(request: Request, exc: Exception):
-    logger.error(
-        "Internal Server Error",
-        error=str(exc),
-        url=str(request.url),
-        method=request.method
-    )
-    return JSONResponse(
-        status_code=500,
-        content={
-            "error": "Internal Server Error",
-            "message": "Une erreur interne s'est produite",
-            "request_id": getattr(request.state, "request_id", None)
-        }
-    )
+# 404: seul le champ "path" varie -> préfixe constant + path encodé
+_404_BODY_PREFIX = orjson.dumps({
+    "error": "Not Found",
+    "message": "Ressource non trouvée"
+})[:-1] + b',"path":'
+_500_BODY = orjson.dumps({
+    "error": "Internal Server Error",
+    "message": "Une erreur interne s'est produite",
+    "request_id": None
+})
+def _json_headers(body: bytes) -> list:
+    return [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode())
+    ]
 
-@app.exception_handler(404)
-async def not_found_handler(request: Request, exc: Exception):
-    return JSONResponse(
-        status_code=404,
-        content={
-            "error": "Not Found",
-            "message": "Ressource non trouvée",
-            "path": str(request.url.path)
-        }
-    )
+class ErrorASGIMiddleware:
+    """
+    Middleware ASGI d'erreurs: les 404 (chemin fréquent sous scanners)
+    et 500 sont servies depuis des bytes préconstruits, sans passer par
+    la conversion dict -> JSONResponse -> bytes de FastAPI
+    """
+
+    __slots__ = ("app",)
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = False
+        body_404 = None
+        body_404_sent = False
+
+        async def send_wrapper(message):
+            nonlocal started, body_404, body_404_sent
+            if message["type"] == "http.response.start":
+                started = True
+                if message["status"] == 404:
+                    # Substituer le corps par défaut par le nôtre en
+                    # conservant les headers posés par les middlewares
+                    # internes (CORS, cookies de session, x-process-time)
+                    body_404 = _404_BODY_PREFIX + orjson.dumps(scope["path"]) + b"}"
+                    headers = [
+                        (name, value)
+                        for name, value in message.get("headers", [])
+                        if name not in (b"content-type", b"content-length")
+                    ]
+                    await send({
+                        "type": "http.response.start",
+                        "status": 404,
+                        "headers": headers + _json_headers(body_404)
+                    })
+                    return
+            elif body_404 is not None and message["type"] == "http.response.body":
+                # Avaler le corps d'origine, envoyer le nôtre une fois
+                if not body_404_sent:
+                    body_404_sent = True
+                    await send({"type": "http.response.body", "body": body_404})
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            logger.exception(
+                "Internal Server Error",
+                url=scope["path"],
+                method=scope.get("method")
+            )
+            if started:
+                # Réponse déjà entamée: relancer pour que le serveur
+                # coupe la connexion au lieu de livrer un corps tronqué
+                raise
+            await send({
+                "type": "http.response.start",
+                "status": 500,
+                "headers": _json_headers(_500_BODY)
+            })
+            await send({"type": "http.response.body", "body": _500_BODY})
+
+app.add_middleware(ErrorASGIMiddleware)
 
 # =============================================================================
 # 🗺️ ROUTES
@@ -215,10 +454,22 @@ async def websocket_endpoint(websocket, client_id: str):
     await websocket_manager.connect(websocket, client_id)
     try:
         while True:
-            data = await websocket.receive_text()
-            await websocket_manager.handle_message(client_id, data)
-    except Exception as e:
-        logger.error(f"Erreur WebSocket: {e}")
+            # Frame brute: chemin zéro-copie pour les frames binaires,
+            # fallback texte (les navigateurs envoient du texte) — orjson
+            # parse indifféremment bytes et str, en un seul passage
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            raw = message.get("bytes")
+            if raw is None:
+                raw = message.get("text", "")
+            await websocket_manager.handle_message(client_id, raw)
+    except WebSocketDisconnect:
+        # Fermeture normale: pas de log ni de capture de traceback
+        pass
+    except Exception:
+        # Traceback construit uniquement sur vraie erreur
+        logger.exception("Erreur WebSocket non gérée", client_id=client_id)
     finally:
         await websocket_manager.disconnect(client_id)
 
@@ -226,44 +477,95 @@ async def websocket_endpoint(websocket, client_id: str):
 # 🩺 ENDPOINTS SYSTÈME
 # =============================================================================
 
+# Cache du health check: les sondes du load balancer peuvent frapper
+# plusieurs fois par seconde, un seul vrai ping Redis par TTL suffit
+_HEALTH_TTL = 1.0
+_health_cache: tuple[float, dict] | None = None
+_health_lock = asyncio.Lock()
+
 @app.get("/health")
 async def health_check():
     """
-    Vérification de santé du système
+    Vérification de santé du système (résultat caché _HEALTH_TTL secondes)
     """
-    try:
-        # Vérifier Redis
-        await redis_client.ping()
-        redis_status = "OK"
-    except Exception:
-        redis_status = "ERROR"
-    
-    return {
-        "status": "OK",
-        "version": "2.0.0",
-        "services": {
-            "database": "OK",  # TODO: vérifier DB
-            "redis": redis_status,
-            "mqtt": "OK" if mqtt_client.is_connected else "ERROR"
-        },
-        "timestamp": time.time()
-    }
+    global _health_cache
+
+    loop = asyncio.get_running_loop()
+    if _health_cache is not None and loop.time() - _health_cache[0] < _HEALTH_TTL:
+        return _health_cache[1]
+
+    async with _health_lock:
+        # Re-vérifier sous verrou (évite la ruée à l'expiration du TTL)
+        if _health_cache is not None and loop.time() - _health_cache[0] < _HEALTH_TTL:
+            return _health_cache[1]
+
+        try:
+            # Vérifier Redis
+            await redis_client.ping()
+            redis_status = "OK"
+        except Exception:
+            redis_status = "ERROR"
+
+        result = {
+            "status": "OK",
+            "version": "2.0.0",
+            "services": {
+                "database": "OK",  # TODO: vérifier DB
+                "redis": redis_status,
+                "mqtt": "OK" if mqtt_client.is_connected else "ERROR"
+            },
+            # Horloge murale requise ici; time_ns évite le float
+            "timestamp": time.time_ns()
+        }
+        _health_cache = (loop.time(), result)
+        return result
 
 @app.get("/")
 async def root():
     """
-    Point d'entrée API avec informations de base
+    Point d'entrée API avec informations de base (bytes précalculés)
     """
-    return {
-        "message": "🌱 Smart Irrigation System API",
-        "version": "2.0.0",
-        "docs": "/docs" if settings.DEBUG else None,
-        "status": "active"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 # Servir fichiers statiques (si nécessaire)
-if settings.DEBUG:
-    app.mount("/static", StaticFiles(directory="static"), name="static")
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles avec cache mémoire (chemin, mtime) -> bytes
+    Un hit coûte un seul stat + lookup dict au lieu de stat+open+read;
+    le mtime invalide naturellement le cache pendant le hot-reload
+    """
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _read_cached(full_path: str, mtime_ns: int) -> bytes:
+        with open(full_path, "rb") as f:
+            return f.read()
+
+    async def get_response(self, path: str, scope) -> Response:
+        root = os.path.realpath(self.directory)
+        full_path = os.path.realpath(os.path.join(root, path))
+
+        # Hors racine ou non-fichier: déléguer à Starlette (404, index, …)
+        if not full_path.startswith(root + os.sep):
+            return await super().get_response(path, scope)
+        try:
+            stat_result = os.stat(full_path)
+        except OSError:
+            return await super().get_response(path, scope)
+        if not stat_module.S_ISREG(stat_result.st_mode):
+            return await super().get_response(path, scope)
+
+        content = self._read_cached(full_path, stat_result.st_mtime_ns)
+        media_type, _ = mimetypes.guess_type(full_path)
+        return Response(content, media_type=media_type or "application/octet-stream")
+
+if _DEBUG:
+    # check_dir=False: pas de scan du répertoire au démarrage
+    app.mount(
+        "/static",
+        CachedStaticFiles(directory="static", check_dir=False),
+        name="static"
+    )
 
 # =============================================================================
 # 🔧 POINT D'ENTRÉE DEVELOPPEMENT
@@ -278,5 +580,8 @@ if __name__ == "__main__":
         port=8000,
         reload=True,
         reload_dirs=["app"],
+        loop="uvloop",      # boucle libuv (~2× débit asyncio)
+        http="httptools",   # parsing HTTP en C
+        ws_per_message_deflate=False,  # compression gérée côté broadcast
         log_level="info"
     )
\ No newline at end of file
@@ -0,0 +1,6 @@
+# 🌱 Smart Irrigation System - WebSocket temps réel
+# Gestion des connexions et diffusion des événements
+
+from app.websocket.manager import WebSocketManager
+
+__all__ = ["WebSocketManager"]
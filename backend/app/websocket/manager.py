@@ -0,0 +1,164 @@
+# 🌱 Smart Irrigation System - Gestionnaire WebSocket
+# Connexions temps réel, réception et diffusion des messages
+
+import asyncio
+import zlib
+import orjson
+import structlog
+from typing import Dict
+
+from fastapi import WebSocket
+
+logger = structlog.get_logger()
+
+class WebSocketManager:
+    """
+    Gestionnaire des connexions WebSocket actives
+    Les messages entrants arrivent en frames brutes (bytes ou texte)
+    et sont parsés une seule fois avec orjson
+    L'envoi passe par une file sortante par client drainée par une
+    tâche unique (pas de create_task par message)
+    """
+
+    # Taille de la file sortante par client (drop-oldest au-delà)
+    OUT_QUEUE_SIZE = 1024
+
+    def __init__(self):
+        self.active_connections: Dict[str, WebSocket] = {}
+        self._out_queues: Dict[str, asyncio.Queue] = {}
+        self._sender_tasks: Dict[str, asyncio.Task] = {}
+
+    # =============================================================================
+    # 🔌 CYCLE DE VIE DES CONNEXIONS
+    # =============================================================================
+
+    async def connect(self, websocket: WebSocket, client_id: str) -> None:
+        """
+        Accepter et enregistrer une nouvelle connexion
+        Démarre la tâche d'envoi dédiée du client
+        """
+        await websocket.accept()
+        self.active_connections[client_id] = websocket
+
+        out_queue: asyncio.Queue = asyncio.Queue(maxsize=self.OUT_QUEUE_SIZE)
+        self._out_queues[client_id] = out_queue
+        self._sender_tasks[client_id] = asyncio.create_task(
+            self._sender(client_id, websocket, out_queue)
+        )
+
+        logger.info("Client WebSocket connecté", client_id=client_id)
+
+    async def disconnect(self, client_id: str) -> None:
+        """
+        Retirer une connexion et arrêter sa tâche d'envoi (idempotent)
+        """
+        task = self._sender_tasks.pop(client_id, None)
+        if task is not None:
+            task.cancel()
+        self._out_queues.pop(client_id, None)
+
+        if self.active_connections.pop(client_id, None) is not None:
+            logger.info("Client WebSocket déconnecté", client_id=client_id)
+
+    # =============================================================================
+    # 📨 MESSAGES ENTRANTS
+    # =============================================================================
+
+    async def handle_message(self, client_id: str, raw: "bytes | str") -> None:
+        """
+        Traiter un message entrant (frame brute -> un seul parse orjson)
+        Accepte bytes (frames binaires) comme str (frames texte)
+        """
+        try:
+            message = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            logger.warning("Message WebSocket invalide", client_id=client_id)
+            return
+
+        # Ping/pong applicatif; les autres types seront branchés sur les
+        # handlers métier (irrigation, climat) au fil de l'intégration
+        if message.get("type") == "ping":
+            await self.send_to_client(client_id, {"type": "pong"})
+
+    # =============================================================================
+    # 📤 ENVOI
+    # =============================================================================
+
+    async def _sender(self, client_id: str, websocket: WebSocket, out_queue: asyncio.Queue) -> None:
+        """
+        Tâche d'envoi unique du client: draine la file et fusionne les
+        messages adjacents en une seule frame (un seul send/syscall)
+        """
+        try:
+            while True:
+                batch = [await out_queue.get()]
+
+                # Fusionner tout ce qui est déjà prêt dans la file
+                try:
+                    while True:
+                        batch.append(out_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    pass
+
+                if len(batch) == 1:
+                    await websocket.send_bytes(batch[0])
+                elif all(buf[:1] == b"{" for buf in batch):
+                    # Messages JSON adjacents coalescés en tableau
+                    await websocket.send_bytes(b"[" + b",".join(batch) + b"]")
+                else:
+                    # Frames binaires (ex: zlib) non coalescables
+                    for buf in batch:
+                        await websocket.send_bytes(buf)
+
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error("Erreur envoi WebSocket", client_id=client_id, error=str(e))
+
+    def _enqueue(self, client_id: str, buf: bytes) -> None:
+        """
+        Publier des bytes vers la file sortante du client
+        Backpressure drop-oldest: la file pleine jette le plus ancien
+        """
+        out_queue = self._out_queues.get(client_id)
+        if out_queue is None:
+            return
+        try:
+            out_queue.put_nowait(buf)
+        except asyncio.QueueFull:
+            try:
+                out_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            out_queue.put_nowait(buf)
+
+    async def send_to_client(self, client_id: str, payload: dict) -> None:
+        """
+        Envoyer un message JSON à un client donné (via sa file sortante)
+        """
+        self._enqueue(client_id, orjson.dumps(payload))
+
+    def broadcast(self, payload: dict) -> None:
+        """
+        Diffuser un message à tous les clients connectés
+        Sérialisé une seule fois: le même buffer bytes est partagé par
+        toutes les files (O(encode + N·send) au lieu de O(N·encode))
+        """
+        buf = orjson.dumps(payload)
+        for client_id in list(self._out_queues):
+            self._enqueue(client_id, buf)
+
+    def broadcast_compressed(self, payload: dict) -> None:
+        """
+        Diffuser en compressant une seule fois (zlib niveau 1)
+        Prévu avec permessage-deflate désactivé côté serveur: la
+        compression par connexion coûterait O(N) CPU + RAM, ici O(1)
+        et le même buffer compressé est partagé par tous les clients
+        (qui décompressent la frame binaire eux-mêmes)
+        """
+        raw = orjson.dumps(payload)
+        comp = zlib.compress(raw, 1)
+        # Ne garder la version compressée que si elle est plus petite
+        buf = comp if len(comp) < len(raw) else raw
+        for client_id in list(self._out_queues):
+            self._enqueue(client_id, buf)
@@ -0,0 +1,25 @@
+# 🌱 Smart Irrigation System - Build extensions compilées
+# Cythonisation optionnelle des modules chauds (importés à chaque démarrage)
+
+from setuptools import setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    # Cython absent: l'application fonctionne en pur Python
+    cythonize = None
+
+# Modules compilés en .so (Cython accepte les .py sans renommage)
+# config.py est exclu: Cython stocke les annotations de la dataclass
+# Settings en str ('bool', 'int', …), ce qui casse la coercition de
+# types de _EnvLoader au chargement des variables d'environnement
+_HOT_MODULES = [
+    "app/core/logging.py",
+]
+
+setup(
+    name="smart-irrigation-backend",
+    version="2.0.0",
+    description="Système d'irrigation intelligente - Backend FastAPI",
+    ext_modules=cythonize(_HOT_MODULES, language_level=3) if cythonize else [],
+)